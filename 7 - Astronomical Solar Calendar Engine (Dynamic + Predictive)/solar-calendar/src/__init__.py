@@ -1 +1,6 @@
 # Package marker for solar calendar project.
+
+# Version of the calendar engine output. Bump on any change to src/calendar or
+# src/astronomy that alters computed values: it is folded into the API's ETags,
+# and past years are served with a one-year immutable Cache-Control.
+__version__ = "1.0.0"
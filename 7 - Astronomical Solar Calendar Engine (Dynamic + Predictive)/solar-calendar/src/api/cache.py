@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from src import __version__ as ENGINE_VERSION
+from src.astronomy.events import resolve_ephemeris_path
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; responses fall back to gzip/identity.
+    brotli = None
+
+# Past years are fully determined by (year, ephemeris, engine version), all of which
+# are folded into the ETag, so they can be cached for a year without revalidation.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CURRENT_CACHE_CONTROL = "public, max-age=86400"
+
+# Preference order when the client accepts several codings with equal weight.
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip", "identity") if brotli else ("gzip", "identity")
+
+
+@dataclass(frozen=True)
+class YearPayload:
+    year: int
+    base_etag: str
+    bodies: Dict[str, bytes]
+
+
+@lru_cache(maxsize=8)
+def _file_sha256(path: str, size: int, mtime_ns: int) -> str:
+    # size and mtime_ns are only part of the cache key: a replaced file is hashed again.
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ephemeris_digest(ephemeris_path: Optional[str] = None) -> str:
+    """
+    SHA-256 of the ephemeris file contents, so swapping kernels invalidates cached years
+    while identical kernels give the same ETags on every host.
+    The hash is memoized per (resolved path, size, mtime), so requests only stat the file.
+    """
+    path = resolve_ephemeris_path(ephemeris_path).resolve()
+    if not path.is_file():
+        raise FileNotFoundError(f"Ephemeris path is not a regular file: {path}")
+    stat = path.stat()
+    return _file_sha256(str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def year_base_etag(year: int, ephemeris_hash: str, engine_version: str = ENGINE_VERSION) -> str:
+    key = f"{year}:{ephemeris_hash}:{engine_version}".encode("utf-8")
+    return hashlib.sha256(key).hexdigest()[:32]
+
+
+def year_etag(year: int, ephemeris_path: Optional[str] = None) -> str:
+    return year_base_etag(year, ephemeris_digest(ephemeris_path))
+
+
+def representation_etag(base_etag: str, encoding: str) -> str:
+    """
+    Strong ETags must differ per content-coding since the bytes differ.
+    """
+    if encoding == "identity":
+        return f'"{base_etag}"'
+    return f'"{base_etag}-{encoding}"'
+
+
+def cache_control_for_year(year: int, now: Optional[datetime] = None) -> str:
+    current_year = (now or datetime.now(timezone.utc)).year
+    return IMMUTABLE_CACHE_CONTROL if year < current_year else CURRENT_CACHE_CONTROL
+
+
+def _json_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is pd.NaT:
+        return None
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_records(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a calendar frame to a JSON array of records.
+    Floats keep their full repr, timestamps use isoformat() and NaN/NaT become null.
+    This runs once per cached year, so the stdlib encoder is fast enough.
+    """
+    records = [
+        {key: _json_value(value) for key, value in record.items()}
+        for record in df.to_dict(orient="records")
+    ]
+    return json.dumps(records, default=_json_default, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_year_payload(year: int, df: pd.DataFrame, base_etag: str) -> YearPayload:
+    raw = encode_records(df)
+    bodies = {
+        "identity": raw,
+        # mtime=0 keeps the gzip bytes deterministic across processes.
+        "gzip": gzip.compress(raw, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        bodies["br"] = brotli.compress(raw, quality=11)
+    return YearPayload(year=year, base_etag=base_etag, bodies=bodies)
+
+
+def select_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Pick the best supported content-coding from an Accept-Encoding header.
+    Falls back to identity when nothing else is acceptable.
+    """
+    if not accept_encoding:
+        return "identity"
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, *params = part.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value.strip())
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+    wildcard = weights.get("*")
+    best, best_weight = "identity", 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding == "identity":
+            continue
+        weight = weights.get(encoding, wildcard if wildcard is not None else 0.0)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison as required for If-None-Match (RFC 9110 §13.1.2).
+    "*" is not honoured: it may only match an existing representation, and the
+    ETag is derived before the year has been validated.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
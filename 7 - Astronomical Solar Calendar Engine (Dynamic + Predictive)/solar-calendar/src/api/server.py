@@ -4,18 +4,40 @@ from functools import lru_cache
 from typing import Optional
 
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
 
+from src import __version__
+from src.api.cache import (
+    YearPayload,
+    build_year_payload,
+    cache_control_for_year,
+    ephemeris_digest,
+    etag_matches,
+    representation_etag,
+    select_encoding,
+    year_etag,
+)
 from src.calendar.compare import compare_calendars
 
-app = FastAPI(title="Astronomical Solar Calendar API", version="1.0.0")
+app = FastAPI(title="Astronomical Solar Calendar API", version=__version__)
 
 
 @lru_cache(maxsize=8)
-def get_calendar(year: int, ephemeris_path: Optional[str] = None) -> pd.DataFrame:
+def _cached_calendar(year: int, ephemeris_path: Optional[str], ephemeris_hash: str) -> pd.DataFrame:
+    # ephemeris_hash is only part of the cache key, so a replaced kernel is recomputed.
     return compare_calendars(year, ephemeris_path=ephemeris_path)
 
 
+def get_calendar(year: int, ephemeris_path: Optional[str] = None) -> pd.DataFrame:
+    return _cached_calendar(year, ephemeris_path, ephemeris_digest(ephemeris_path))
+
+
+@lru_cache(maxsize=32)
+def get_year_payload(year: int, ephemeris_path: Optional[str], base_etag: str) -> YearPayload:
+    # Keyed on the ETag so the cached bytes can never be served under a newer ETag.
+    return build_year_payload(year, get_calendar(year, ephemeris_path), base_etag)
+
+
 @app.get("/solar/day")
 def solar_day(date: str, ephemeris_path: Optional[str] = None):
     try:
@@ -31,6 +53,25 @@ def solar_day(date: str, ephemeris_path: Optional[str] = None):
 
 
 @app.get("/solar/year")
-def solar_year(year: int, ephemeris_path: Optional[str] = None):
-    cal = get_calendar(year, ephemeris_path)
-    return cal.to_dict(orient="records")
+def solar_year(
+    year: int,
+    ephemeris_path: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    encoding = select_encoding(accept_encoding)
+    # The ETag only depends on year, ephemeris and engine version, so revalidation
+    # can be answered without building or serializing the calendar.
+    base_etag = year_etag(year, ephemeris_path)
+    etag = representation_etag(base_etag, encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control_for_year(year),
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    payload = get_year_payload(year, ephemeris_path, base_etag)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=payload.bodies[encoding], media_type="application/json", headers=headers)
@@ -0,0 +1,207 @@
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api import cache
+from src.api.cache import (
+    CURRENT_CACHE_CONTROL,
+    IMMUTABLE_CACHE_CONTROL,
+    build_year_payload,
+    cache_control_for_year,
+    etag_matches,
+    representation_etag,
+    select_encoding,
+    year_base_etag,
+)
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2022-01-01", periods=2, tz="UTC", freq="D"),
+            "season": ["winter", "winter"],
+            "solar_index": [57, 58],
+            "progress": [0.6179775280898876, 0.6292134831460674],
+            "fixed_index": [np.nan, 30.0],
+        }
+    )
+
+
+def test_payload_roundtrips_records():
+    payload = build_year_payload(2022, _frame(), "abc")
+    records = json.loads(payload.bodies["identity"])
+    assert records[0]["date"] == "2022-01-01T00:00:00+00:00"
+    assert records[1]["solar_index"] == 58
+    assert records[0]["progress"] == 0.6179775280898876
+    assert records[0]["fixed_index"] is None
+    assert gzip.decompress(payload.bodies["gzip"]) == payload.bodies["identity"]
+
+
+def test_etag_depends_on_inputs():
+    base = year_base_etag(2022, "hash-a", "1.0.0")
+    assert base == year_base_etag(2022, "hash-a", "1.0.0")
+    assert base != year_base_etag(2023, "hash-a", "1.0.0")
+    assert base != year_base_etag(2022, "hash-b", "1.0.0")
+    assert base != year_base_etag(2022, "hash-a", "1.0.1")
+    assert representation_etag(base, "identity") != representation_etag(base, "gzip")
+
+
+def _write_kernel(path, contents):
+    path.write_bytes(contents)
+    # Force a distinct mtime even on filesystems with coarse timestamps.
+    stamp = path.stat().st_mtime_ns + 10**9
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_ephemeris_digest_rejects_non_regular_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        cache.ephemeris_digest(str(tmp_path))
+
+
+def test_ephemeris_digest_follows_contents(tmp_path):
+    first = tmp_path / "a.bsp"
+    second = tmp_path / "b.bsp"
+    _write_kernel(first, b"kernel-1")
+    second.write_bytes(b"kernel-1")
+    digest = cache.ephemeris_digest(str(first))
+    assert digest == cache.ephemeris_digest(str(second))
+    _write_kernel(first, b"kernel-2")
+    assert cache.ephemeris_digest(str(first)) != digest
+
+
+def test_if_none_match():
+    etag = representation_etag("abc", "gzip")
+    assert etag_matches(f'"x", {etag}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert not etag_matches("*", etag)
+    assert not etag_matches('"abc"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_select_encoding():
+    assert select_encoding(None) == "identity"
+    assert select_encoding("gzip, deflate") == "gzip"
+    assert select_encoding("gzip;q=0, deflate") == "identity"
+    assert select_encoding("gzip;foo=1;q=0") == "identity"
+    assert select_encoding("gzip; Q=0.5") == "gzip"
+    assert select_encoding("deflate") == "identity"
+
+
+def test_select_encoding_prefers_brotli():
+    pytest.importorskip("brotli")
+    assert select_encoding("gzip, br") == "br"
+    assert select_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def test_cache_control_for_year():
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    assert cache_control_for_year(2024, now) == IMMUTABLE_CACHE_CONTROL
+    assert cache_control_for_year(2025, now) == CURRENT_CACHE_CONTROL
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from src.api import server
+
+    kernel = tmp_path / "kernel.bsp"
+    _write_kernel(kernel, b"kernel-1")
+    calls = []
+
+    def fake_compare(year, ephemeris_path=None):
+        calls.append(year)
+        df = _frame()
+        df["season"] = Path(ephemeris_path).read_text()
+        return df
+
+    def clear():
+        server._cached_calendar.cache_clear()
+        server.get_year_payload.cache_clear()
+        cache._file_sha256.cache_clear()
+
+    monkeypatch.setattr(server, "compare_calendars", fake_compare)
+    clear()
+    client = TestClient(server.app)
+    yield client, calls, kernel
+    clear()
+
+
+def _get(client, kernel, year=2022, **headers):
+    headers.setdefault("Accept-Encoding", "identity")
+    return client.get("/solar/year", params={"year": year, "ephemeris_path": str(kernel)}, headers=headers)
+
+
+def _expected_etag(kernel, year=2022, encoding="identity"):
+    return representation_etag(year_base_etag(year, cache.ephemeris_digest(str(kernel))), encoding)
+
+
+def test_year_endpoint_serves_json_with_cache_headers(api):
+    client, _, kernel = api
+    response = _get(client, kernel)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == _expected_etag(kernel)
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in response.headers
+    assert response.json()[0]["progress"] == 0.6179775280898876
+
+
+def test_year_endpoint_gzip_matches_identity(api):
+    client, _, kernel = api
+    identity = _get(client, kernel)
+    # Keep httpx from transparently decoding so the raw gzip bytes can be checked.
+    with client.stream(
+        "GET",
+        "/solar/year",
+        params={"year": 2022, "ephemeris_path": str(kernel)},
+        headers={"Accept-Encoding": "gzip"},
+    ) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == _expected_etag(kernel, encoding="gzip")
+    assert gzip.decompress(raw) == identity.content
+
+
+def test_year_endpoint_not_modified_skips_calendar(api):
+    client, calls, kernel = api
+    etag = _expected_etag(kernel)
+    response = _get(client, kernel, **{"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert calls == []
+
+
+def test_year_endpoint_ignores_wildcard_if_none_match(api):
+    client, calls, kernel = api
+    response = _get(client, kernel, **{"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert calls == [2022]
+
+
+def test_year_endpoint_rebuilds_when_ephemeris_changes(api):
+    client, calls, kernel = api
+    first = _get(client, kernel)
+    assert first.json()[0]["season"] == "kernel-1"
+    assert _get(client, kernel).content == first.content
+    assert calls == [2022]
+
+    _write_kernel(kernel, b"kernel-2")
+    second = _get(client, kernel)
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.headers["etag"] == _expected_etag(kernel)
+    assert second.json()[0]["season"] == "kernel-2"
+    assert calls == [2022, 2022]
+    # The old ETag no longer validates against the replaced kernel.
+    assert _get(client, kernel, **{"If-None-Match": first.headers["etag"]}).status_code == 200